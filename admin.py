@@ -0,0 +1,80 @@
+import functools
+import hmac
+import logging
+
+from flask import Response, jsonify, request
+
+from diagnostics import MAX_PROFILE_SECONDS, MAX_TRACE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def register_admin(app, games, socketio, limiter, drain, profiler, tracer):
+    def require_admin(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            token = app.config['ADMIN_TOKEN']
+            scheme, _, supplied = request.headers.get('Authorization', '').partition(' ')
+            if not token or scheme != 'Bearer' or not hmac.compare_digest(supplied.encode(), token.encode()):
+                return jsonify({"success": False, "message": "Unauthorized"}), 401
+            return view(*args, **kwargs)
+        return wrapper
+
+    def seconds_arg(default, maximum):
+        try:
+            seconds = float(request.args.get('seconds', default))
+        except ValueError:
+            return None
+        return seconds if 0 < seconds <= maximum else None
+
+    @app.route('/admin/stats')
+    @require_admin
+    def stats():
+        return jsonify({
+            "games": len(games),
+            "draining": drain.active,
+            "throttled": dict(limiter.throttled),
+        })
+
+    @app.route('/admin/profile', methods=['POST'])
+    @require_admin
+    def profile():
+        seconds = seconds_arg(10, MAX_PROFILE_SECONDS)
+        if seconds is None:
+            return jsonify({"success": False, "message": f"seconds must be in (0, {MAX_PROFILE_SECONDS}]"}), 400
+        if profiler.running:
+            return jsonify({"success": False, "message": "A profile is already running"}), 409
+
+        logger.info(f"Sampling profiler started for {seconds}s")
+        folded = profiler.profile(seconds, socketio.sleep)
+        return Response(folded, mimetype='text/plain', headers={
+            'Content-Disposition': 'attachment; filename=simchess-profile.folded'
+        })
+
+    @app.route('/admin/trace/<game_id>', methods=['POST'])
+    @require_admin
+    def start_trace(game_id):
+        seconds = seconds_arg(60, MAX_TRACE_SECONDS)
+        if seconds is None:
+            return jsonify({"success": False, "message": f"seconds must be in (0, {MAX_TRACE_SECONDS}]"}), 400
+        if game_id not in games:
+            return jsonify({"success": False, "message": "Game not found"}), 404
+
+        tracer.start(game_id, seconds)
+        return jsonify({"success": True, "message": f"Tracing for {seconds:g}s"})
+
+    @app.route('/admin/trace/<game_id>', methods=['GET'])
+    @require_admin
+    def get_trace(game_id):
+        if not tracer.has_trace(game_id):
+            return jsonify({"success": False, "message": "No trace for this game"}), 404
+        resp = jsonify(tracer.export(game_id))
+        resp.headers['Content-Disposition'] = f'attachment; filename=trace-{game_id}.json'
+        return resp
+
+    @app.route('/admin/trace/<game_id>', methods=['DELETE'])
+    @require_admin
+    def stop_trace(game_id):
+        if tracer.stop(game_id) is None:
+            return jsonify({"success": False, "message": "No trace for this game"}), 404
+        return jsonify({"success": True, "message": "Trace stopped"})
@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 
@@ -13,6 +14,10 @@ from flask import Flask
 from flask_socketio import SocketIO
 from flask_cors import CORS
 
+from diagnostics import GameTracer, SamplingProfiler
+from handoff import Drain, serve_handoff, take_over_games
+from ratelimit import RoomBroadcaster, SocketRateLimiter
+
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
@@ -25,17 +30,42 @@ socketio = SocketIO()
 games = {}
 
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__, static_folder='static')
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'simchess-secret!')
+    # Partial overrides of ratelimit.DEFAULT_LIMITS, e.g.
+    # SOCKET_RATE_LIMITS='{"sid": {"submit_move": [2, 4]}, "room": [5, 10]}'
+    app.config['SOCKET_RATE_LIMITS'] = json.loads(os.environ.get('SOCKET_RATE_LIMITS', '{}'))
+    # Unix socket used to pass live games to a replacement process on deploy
+    app.config.setdefault('HANDOFF_SOCKET', os.environ.get('HANDOFF_SOCKET'))
+    # Bearer token for /admin/*; the admin endpoints reject everything if unset
+    app.config.setdefault('ADMIN_TOKEN', os.environ.get('ADMIN_TOKEN'))
+    # Explicit settings (tests, embedding) win over the environment
+    app.config.update(config or {})
 
     CORS(app)
     socketio.init_app(app, cors_allowed_origins='*', async_mode=_async_mode)
 
+    from admin import register_admin
+    from assets import init_assets
     from routes import register_routes
     from sockets import register_sockets
-    register_routes(app, games, socketio)
-    register_sockets(socketio, games)
+    assets = init_assets(app)
+    limiter = SocketRateLimiter(app.config['SOCKET_RATE_LIMITS'])
+    broadcaster = RoomBroadcaster(socketio, limiter)
+    drain = Drain()
+    tracer = GameTracer(socketio, games)
+    register_routes(app, games, broadcaster, assets, drain)
+    register_sockets(socketio, games, limiter, broadcaster, drain, tracer)
+    register_admin(app, games, socketio, limiter, drain, SamplingProfiler(), tracer)
+
+    handoff_path = app.config['HANDOFF_SOCKET']
+    if handoff_path:
+        # Starting without the games would leave this process sharing the port
+        # with the one that holds them, so refuse to boot instead.
+        if not take_over_games(handoff_path, games):
+            raise RuntimeError(f"Hand-off from {handoff_path} failed; the running instance keeps serving")
+        serve_handoff(socketio, games, drain, handoff_path)
 
     return app
 
@@ -0,0 +1,168 @@
+import base64
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+
+from flask import Response, abort, render_template, request
+
+# Brotli is optional — gzip alone is fine if the wheel isn't installed.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Compressing tiny or already-compressed files costs more than it saves.
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+MIN_COMPRESS_SIZE = 512
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+PIECE_DIR = 'img/chesspieces/wikipedia'
+PIECE_BUNDLE = 'js/pieces.js'
+
+
+class Asset:
+    """One static file held in memory with its precompressed variants."""
+
+    def __init__(self, logical_name, body, mimetype):
+        self.logical_name = logical_name
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.encodings = {'identity': body}
+
+        if len(body) >= MIN_COMPRESS_SIZE and mimetype.startswith(COMPRESSIBLE_TYPES):
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                self.encodings['gzip'] = gz
+            if brotli is not None:
+                br = brotli.compress(body, quality=11)
+                if len(br) < len(body):
+                    self.encodings['br'] = br
+
+    @property
+    def hashed_name(self):
+        root, ext = posixpath.splitext(self.logical_name)
+        return f"{root}.{self.digest}{ext}"
+
+    def pick_encoding(self, accept_encoding):
+        """Return the smallest variant the client accepts."""
+        accepted = {part.split(';')[0].strip() for part in accept_encoding.split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and encoding in accepted:
+                return encoding
+        return 'identity'
+
+    def etag(self, encoding):
+        # Strong validators must differ per content-coding (RFC 9110 8.8.3)
+        return f"{self.digest}-{encoding}"
+
+    def response(self, cache_control):
+        encoding = self.pick_encoding(request.headers.get('Accept-Encoding', ''))
+        etag = self.etag(encoding)
+        if request.if_none_match.contains(etag):
+            resp = Response(status=304)
+        else:
+            resp = Response(self.encodings[encoding], mimetype=self.mimetype)
+            if encoding != 'identity':
+                resp.headers['Content-Encoding'] = encoding
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = cache_control
+        resp.headers['Vary'] = 'Accept-Encoding'
+        return resp
+
+
+class AssetStore:
+    """Fingerprinted, precompressed copy of ``static/`` built once at startup.
+
+    Templates keep calling ``url_for('static', filename=...)``; a url_defaults
+    hook rewrites the filename to its content-hashed form so the browser can
+    cache it forever.  Requests for the plain (unhashed) name still work but are
+    revalidated on every load.
+    """
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self.by_logical = {}
+        self.by_hashed = {}
+        self._pages = {}
+
+    def build(self):
+        for dirpath, _, filenames in os.walk(self.static_folder):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                logical = os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                with open(path, 'rb') as f:
+                    self._add(Asset(logical, f.read(), mimetype))
+
+        self._build_piece_bundle()
+
+        total = sum(len(a.encodings['identity']) for a in self.by_logical.values())
+        logger.info(f"Asset store built: {len(self.by_logical)} files, {total} bytes "
+                    f"(brotli {'on' if brotli else 'off'})")
+        return self
+
+    def _add(self, asset):
+        self.by_logical[asset.logical_name] = asset
+        self.by_hashed[asset.hashed_name] = asset
+
+    def _build_piece_bundle(self):
+        """Pack the piece PNGs into one script of data URIs.
+
+        chessboard.js renders every piece as its own <img>, so a CSS sprite
+        sheet doesn't fit; a single bundle gives the same one-request load.
+        """
+        prefix = PIECE_DIR + '/'
+        pieces = {}
+        for name, asset in sorted(self.by_logical.items()):
+            if name.startswith(prefix) and name.endswith('.png'):
+                piece = posixpath.splitext(posixpath.basename(name))[0]
+                data = base64.b64encode(asset.encodings['identity']).decode('ascii')
+                pieces[piece] = f"data:image/png;base64,{data}"
+        if not pieces:
+            return
+
+        entries = ',\n'.join(f'    "{piece}": "{uri}"' for piece, uri in pieces.items())
+        body = f"window.SimChessPieceImages = {{\n{entries}\n}};\n".encode('ascii')
+        self._add(Asset(PIECE_BUNDLE, body, 'application/javascript'))
+
+    def url_for_asset(self, filename):
+        asset = self.by_logical.get(filename)
+        return asset.hashed_name if asset else filename
+
+    def serve(self, filename):
+        asset = self.by_hashed.get(filename)
+        if asset is not None:
+            return asset.response(IMMUTABLE_CACHE)
+        asset = self.by_logical.get(filename)
+        if asset is not None:
+            return asset.response(REVALIDATE_CACHE)
+        abort(404)
+
+    def render_page(self, template_name):
+        """Render a static template once and serve the cached bytes after that."""
+        page = self._pages.get(template_name)
+        if page is None:
+            body = render_template(template_name).encode('utf-8')
+            page = Asset(template_name, body, 'text/html')
+            self._pages[template_name] = page
+        return page.response(REVALIDATE_CACHE)
+
+
+def init_assets(app):
+    store = AssetStore(app.static_folder).build()
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = store.url_for_asset(values['filename'])
+
+    app.view_functions['static'] = store.serve
+    app.extensions['assets'] = store
+    return store
@@ -0,0 +1,43 @@
+#!/bin/bash
+
+# Zero-downtime deploy: start the idle simchess@ instance, let it take over the
+# live games from the running one, and wait for the old instance to exit.
+# If the hand-off fails, the new instance is stopped and the old one keeps
+# serving its games.
+
+HANDOFF_TIMEOUT=30
+
+if systemctl is-active --quiet simchess@blue; then
+    OLD=blue; NEW=green
+elif systemctl is-active --quiet simchess@green; then
+    OLD=green; NEW=blue
+else
+    echo "No simchess@ instance running; starting simchess@blue"
+    systemctl start simchess@blue
+    exit $?
+fi
+
+rollback() {
+    echo "❌ $1; stopping simchess@$NEW, simchess@$OLD keeps serving"
+    echo "   Check: journalctl -u simchess@$NEW"
+    systemctl stop "simchess@$NEW"
+    exit 1
+}
+
+echo "🚀 Starting simchess@$NEW (taking over from simchess@$OLD)"
+systemctl start "simchess@$NEW" || rollback "simchess@$NEW failed to start"
+
+# The old instance exits by itself once the hand-off is acknowledged. The new
+# one refuses to boot if the hand-off fails, so it dropping out means failure.
+for _ in $(seq $((HANDOFF_TIMEOUT * 10))); do
+    if ! systemctl is-active --quiet "simchess@$OLD"; then
+        echo "✅ Hand-off complete; simchess@$NEW is serving"
+        exit 0
+    fi
+    if ! systemctl is-active --quiet "simchess@$NEW"; then
+        rollback "simchess@$NEW exited before taking over"
+    fi
+    sleep 0.1
+done
+
+rollback "No hand-off within ${HANDOFF_TIMEOUT}s"
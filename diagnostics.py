@@ -0,0 +1,213 @@
+import functools
+import logging
+import os
+import sys
+import time
+import types
+from collections import Counter, deque
+
+# The sampler must be a real OS thread: a green thread only runs when the hub
+# switches to it, so it would never see the code that is actually hogging it.
+try:
+    from eventlet.patcher import original
+    _threading = original('threading')
+    _sleep = original('time').sleep
+except ImportError:
+    import threading as _threading
+    _sleep = time.sleep
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 120
+MAX_TRACE_SECONDS = 600
+MAX_TRACE_EVENTS = 5000
+# Finished traces kept for download until fetched or deleted
+MAX_FINISHED_TRACES = 20
+
+# Engine entry points wrapped on a traced game
+TRACED_METHODS = ('submit_move', 'process_moves', 'check_immediate_checkmate', 'get_state')
+
+
+class SamplingProfiler:
+    """Samples the server's stacks from a background OS thread.
+
+    Output is in "folded" format (``frame;frame;frame count`` per line), which
+    flamegraph.pl, speedscope and inferno all read directly.  Nothing runs
+    between profiles.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.running = False
+
+    def profile(self, seconds, sleep):
+        """Sample for ``seconds``; ``sleep`` is the caller's cooperative sleep."""
+        self.running = True
+        stacks = Counter()
+        stop = _threading.Event()
+        sampler = _threading.Thread(target=self._sample, args=(stacks, stop), daemon=True)
+        sampler.start()
+        try:
+            sleep(seconds)
+        finally:
+            stop.set()
+            sampler.join()
+            self.running = False
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def _sample(self, stacks, stop):
+        own_ident = _threading.get_ident()
+        while not stop.is_set():
+            for ident, frame in sys._current_frames().items():
+                if ident != own_ident:
+                    stacks[self._fold(frame)] += 1
+            _sleep(self.interval)
+
+    @staticmethod
+    def _fold(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+
+class GameTracer:
+    """Records timing spans for selected games in Chrome trace-event format.
+
+    Untraced games pay nothing: engine methods are wrapped on the traced game
+    instance only, and ``socketio.emit`` and the Socket.IO packet encoder are
+    wrapped only while a trace runs.  Socket handlers go through
+    ``handler()``, which is a single dict check when nothing is being traced.
+
+    ``json:<event>`` spans time the encode Socket.IO itself performs while
+    emitting to the traced game's room.
+    """
+
+    def __init__(self, socketio, games):
+        self.socketio = socketio
+        self.games = games
+        self.traces = {}
+        self.finished = {}
+        self._emitting = None
+        self._packet_json = None
+        self._origin = time.perf_counter()
+
+    def start(self, game_id, seconds):
+        game = self.games[game_id]
+        if game_id not in self.traces:
+            for name in TRACED_METHODS:
+                setattr(game, name, self._wrap_method(game_id, name, getattr(game, name)))
+        self.finished.pop(game_id, None)
+        events = self.traces[game_id] = deque(maxlen=MAX_TRACE_EVENTS)
+        if 'emit' not in vars(self.socketio):
+            self.socketio.emit = self._wrap_emit(self.socketio.emit)
+            packet_class = self.socketio.server.packet_class
+            self._packet_json = packet_class.json
+            packet_class.json = self._wrap_json(self._packet_json)
+
+        self.socketio.start_background_task(self._expire, game_id, seconds, events)
+        logger.info(f"Tracing game {game_id} for {seconds}s")
+
+    def has_trace(self, game_id):
+        return game_id in self.traces or game_id in self.finished
+
+    def stop(self, game_id):
+        """Stop tracing and discard the spans; returns None if there were none."""
+        events = self._unwrap(game_id)
+        finished = self.finished.pop(game_id, None)
+        return events if events is not None else finished
+
+    def _unwrap(self, game_id):
+        events = self.traces.pop(game_id, None)
+        game = self.games.get(game_id)
+        if game is not None:
+            for name in TRACED_METHODS:
+                vars(game).pop(name, None)
+        if not self.traces and 'emit' in vars(self.socketio):
+            del self.socketio.emit
+            self.socketio.server.packet_class.json = self._packet_json
+        return events
+
+    def _expire(self, game_id, seconds, events):
+        self.socketio.sleep(seconds)
+        # Restarting a trace replaces its buffer, which supersedes this timer.
+        if self.traces.get(game_id) is events:
+            self._unwrap(game_id)
+            # Keep the capture for download; drop the oldest beyond the cap.
+            self.finished[game_id] = events
+            while len(self.finished) > MAX_FINISHED_TRACES:
+                del self.finished[next(iter(self.finished))]
+
+    def export(self, game_id):
+        """Spans so far for a running trace; a finished trace is handed over once."""
+        if game_id in self.traces:
+            events = self.traces[game_id]
+        else:
+            events = self.finished.pop(game_id, ())
+        return {"traceEvents": list(events), "displayTimeUnit": "ms"}
+
+    def _record(self, game_id, name, start, end):
+        events = self.traces.get(game_id)
+        if events is not None:
+            events.append({
+                "name": name, "ph": "X", "pid": 1, "tid": 1,
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+            })
+
+    def _wrap_method(self, game_id, name, method):
+        @functools.wraps(method)
+        def traced(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._record(game_id, f"engine:{name}", start, time.perf_counter())
+        return traced
+
+    def _wrap_emit(self, emit):
+        @functools.wraps(emit)
+        def traced(event, *args, **kwargs):
+            room = kwargs.get('to') or kwargs.get('room')
+            if room not in self.traces:
+                return emit(event, *args, **kwargs)
+            start = time.perf_counter()
+            self._emitting = (room, event)
+            try:
+                return emit(event, *args, **kwargs)
+            finally:
+                self._emitting = None
+                self._record(room, f"emit:{event}", start, time.perf_counter())
+        return traced
+
+    def _wrap_json(self, json_module):
+        def dumps(*args, **kwargs):
+            if self._emitting is None:
+                return json_module.dumps(*args, **kwargs)
+            room, event = self._emitting
+            start = time.perf_counter()
+            try:
+                return json_module.dumps(*args, **kwargs)
+            finally:
+                self._record(room, f"json:{event}", start, time.perf_counter())
+        return types.SimpleNamespace(dumps=dumps, loads=json_module.loads)
+
+    def handler(self, event):
+        """Decorator timing a socket handler when its game is being traced."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(data, *args):
+                if not self.traces:
+                    return fn(data, *args)
+                game_id = data.get('game_id') if isinstance(data, dict) else None
+                if game_id not in self.traces:
+                    return fn(data, *args)
+                start = time.perf_counter()
+                try:
+                    return fn(data, *args)
+                finally:
+                    self._record(game_id, f"socket:{event}", start, time.perf_counter())
+            return wrapper
+        return decorator
@@ -1,5 +1,7 @@
 import chess
+import hmac
 import logging
+import secrets
 
 from engine.board import SimChessBoard
 
@@ -31,6 +33,9 @@ class SimChessGame:
         self.last_illegal_moves = {"white": None, "black": None}
         # Position history for threefold repetition (only legal positions)
         self.position_history = [self._get_position_key()]
+        # Secret issued with each seat; presenting it reclaims the seat after a
+        # reconnect or a process hand-off
+        self.seat_tokens = {"white": None, "black": None}
 
     def _handle_mutual_illegality(self, result, white_move_str, black_move_str, reason):
         """Handle mutual illegality: increment counter, check for draw, prepare result."""
@@ -62,13 +67,22 @@ class SimChessGame:
         result["clock_seconds"] = self.clock_seconds
         return result
 
-    def assign_player(self, player_id):
-        if self.players["white"] is None:
-            self.players["white"] = player_id
-            return "white"
-        elif self.players["black"] is None:
-            self.players["black"] = player_id
-            return "black"
+    def assign_player(self, player_id, seat_token=None):
+        if seat_token:
+            # Tokens come straight from the client, so anything but a string
+            # simply fails to match.
+            if not isinstance(seat_token, str):
+                return None
+            for color, token in self.seat_tokens.items():
+                if token is not None and hmac.compare_digest(token.encode(), seat_token.encode()):
+                    self.players[color] = player_id
+                    return color
+            return None
+        for color in ("white", "black"):
+            if self.seat_tokens[color] is None:
+                self.players[color] = player_id
+                self.seat_tokens[color] = secrets.token_urlsafe(16)
+                return color
         return None
 
     def _get_position_key(self):
@@ -529,3 +543,46 @@ class SimChessGame:
             "penalty_seconds": self.one_sided_penalty_seconds,
             "clock_seconds": self.clock_seconds
         }
+
+    # Attributes carried across a process hand-off. Socket ids are dropped,
+    # since they mean nothing to the new process; seat tokens let players
+    # reclaim their seats there.
+    SNAPSHOT_FIELDS = (
+        "game_id", "moves", "ready_status", "turn_number", "illegal_attempt",
+        "game_over", "winner", "win_reason", "draw_reason", "illegal_move_counts",
+        "mutual_illegal_count", "one_sided_illegal_counts", "one_sided_threshold",
+        "one_sided_penalty_seconds", "clock_seconds", "last_illegal_moves",
+        "position_history", "seat_tokens",
+    )
+
+    def to_snapshot(self):
+        snapshot = {name: getattr(self, name) for name in self.SNAPSHOT_FIELDS}
+        snapshot["board"] = self.board.to_snapshot()
+        return snapshot
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        # Skip __init__: it builds a fresh board and FEN we'd throw away
+        game = cls.__new__(cls)
+        for name in cls.SNAPSHOT_FIELDS:
+            if name in snapshot:
+                setattr(game, name, snapshot[name])
+        game.board = SimChessBoard.from_snapshot(snapshot["board"])
+        game.players = {"white": None, "black": None}
+
+        # A snapshot from an older release lacks attributes added since; give
+        # those the values a new game starts with.
+        missing = cls._attribute_names() - vars(game).keys()
+        if missing:
+            defaults = vars(cls(snapshot["game_id"]))
+            for name in missing:
+                setattr(game, name, defaults[name])
+        return game
+
+    _attribute_names_cache = None
+
+    @classmethod
+    def _attribute_names(cls):
+        if cls._attribute_names_cache is None:
+            cls._attribute_names_cache = frozenset(vars(cls(None)))
+        return cls._attribute_names_cache
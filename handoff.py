@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import signal
+import socket
+import struct
+import sys
+import zlib
+
+from engine.game import SimChessGame
+
+logger = logging.getLogger(__name__)
+
+HANDOFF_REQUEST = b"HANDOFF\n"
+HANDOFF_ACK = b"OK\n"
+HANDOFF_TIMEOUT = 5
+# Time for the server_handoff broadcast to reach clients before we shut down
+HANDOFF_GRACE = 0.2
+# Bump when a snapshot field changes meaning; added fields need no bump, since
+# the receiving side fills them with their defaults.
+SNAPSHOT_VERSION = 1
+_LENGTH = struct.Struct('!I')
+
+
+class Drain:
+    """Drain flag shared by routes and socket handlers.
+
+    While active the process refuses new games and tells clients to reconnect,
+    so nothing changes between the snapshot being taken and the new process
+    taking over.
+    """
+
+    def __init__(self):
+        self.active = False
+
+
+def pack_games(games):
+    snapshots = [game.to_snapshot() for game in games.values() if not game.game_over]
+    payload = {"version": SNAPSHOT_VERSION, "games": snapshots}
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+
+
+def unpack_games(payload):
+    payload = json.loads(zlib.decompress(payload))
+    version = payload.get("version") if isinstance(payload, dict) else None
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version!r}, expected {SNAPSHOT_VERSION}")
+    return {s['game_id']: SimChessGame.from_snapshot(s) for s in payload["games"]}
+
+
+def _recv_exact(conn, size):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = conn.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("hand-off peer closed the connection")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def take_over_games(path, games):
+    """Pull live games from the process currently serving on ``path``.
+
+    Returns True when the socket path is free to bind afterwards, i.e. either
+    the hand-off completed or nothing was listening there.
+    """
+    if not os.path.exists(path):
+        return True
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(HANDOFF_TIMEOUT)
+    try:
+        conn.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        logger.info(f"Stale hand-off socket at {path}, starting fresh")
+        conn.close()
+        return True
+
+    try:
+        conn.sendall(HANDOFF_REQUEST)
+        size, = _LENGTH.unpack(_recv_exact(conn, _LENGTH.size))
+        restored = unpack_games(_recv_exact(conn, size))
+        conn.sendall(HANDOFF_ACK)
+        games.update(restored)
+    except (OSError, ValueError, KeyError, TypeError, struct.error, zlib.error) as e:
+        logger.error(f"Hand-off from {path} failed: {e!r}")
+        return False
+    finally:
+        conn.close()
+
+    logger.info(f"Took over {len(restored)} games ({size} bytes) from previous process")
+    return True
+
+
+def serve_handoff(socketio, games, drain, path):
+    """Listen on ``path`` for a replacement process and hand it our games."""
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    def accept_loop():
+        while True:
+            conn, _ = server.accept()
+            try:
+                if _hand_off(conn, games, drain):
+                    break
+            finally:
+                conn.close()
+        server.close()
+        # Every client is now told to reconnect; the replacement holds the games.
+        socketio.emit('server_handoff', {})
+        socketio.sleep(HANDOFF_GRACE)
+        _shut_down()
+
+    socketio.start_background_task(accept_loop)
+    logger.info(f"Hand-off socket listening on {path}")
+
+
+def _shut_down():
+    """Exit so reconnecting clients can only reach the replacement.
+
+    Under gunicorn we are a worker: stopping the arbiter closes the shared
+    listener and exits cleanly, where exiting the worker alone would just get
+    it respawned.
+    """
+    target = os.getppid() if 'gunicorn.arbiter' in sys.modules else os.getpid()
+    logger.info(f"Hand-off complete, sending SIGTERM to {target}")
+    os.kill(target, signal.SIGTERM)
+
+
+def _hand_off(conn, games, drain):
+    conn.settimeout(HANDOFF_TIMEOUT)
+    try:
+        if _recv_exact(conn, len(HANDOFF_REQUEST)) != HANDOFF_REQUEST:
+            return False
+        drain.active = True
+        payload = pack_games(games)
+        conn.sendall(_LENGTH.pack(len(payload)) + payload)
+        if _recv_exact(conn, len(HANDOFF_ACK)) != HANDOFF_ACK:
+            raise ConnectionError("hand-off was not acknowledged")
+    except (OSError, ValueError) as e:
+        # The replacement never confirmed, so keep serving our own games.
+        logger.error(f"Hand-off aborted, resuming service: {e}")
+        drain.active = False
+        return False
+
+    logger.info(f"Handed off live games ({len(payload)} bytes), draining")
+    return True
@@ -0,0 +1,199 @@
+import logging
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# (rate per second, burst) for each inbound event, keyed per connection and per
+# game.  Legitimate clients send a handful of these per turn, so the limits only
+# bite when a tab is looping or someone is scripting the socket.
+DEFAULT_LIMITS = {
+    'sid': {
+        'join': (1, 5),
+        'submit_move': (5, 10),
+        'start_clocks': (1, 3),
+        'time_out': (1, 3),
+    },
+    'game': {
+        'submit_move': (10, 20),
+        'start_clocks': (1, 3),
+        'time_out': (1, 3),
+    },
+    # Outbound state broadcasts per room.
+    'room': (10, 20),
+}
+
+
+def merge_limits(overrides=None):
+    """Lay partial overrides over DEFAULT_LIMITS, event by event.
+
+    ``{"sid": {"submit_move": [2, 4]}, "room": [5, 10]}`` changes just those
+    limits; lists are accepted so the overrides can come from JSON.
+    """
+    limits = {
+        'sid': dict(DEFAULT_LIMITS['sid']),
+        'game': dict(DEFAULT_LIMITS['game']),
+        'room': DEFAULT_LIMITS['room'],
+    }
+    for scope, value in (overrides or {}).items():
+        if scope not in limits:
+            raise ValueError(f"Unknown rate limit scope: {scope}")
+        if scope == 'room':
+            limits['room'] = _check_limit('room', value)
+        else:
+            limits[scope].update({event: _check_limit(f"{scope}.{event}", limit)
+                                  for event, limit in value.items()})
+    return limits
+
+
+def _check_limit(name, limit):
+    rate, burst = limit
+    # A zero rate would never refill (and divides by zero in wait_time); a
+    # burst below one would never let anything through.
+    if not rate > 0 or not burst >= 1:
+        raise ValueError(f"Rate limit {name} needs rate > 0 and burst >= 1, got {list(limit)}")
+    return (rate, burst)
+
+
+# Buckets untouched for this long are full again, so they can be forgotten.
+IDLE_BUCKET_SECONDS = 60
+PRUNE_THRESHOLD = 10000
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def consume(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self):
+        """Seconds until the next token is available."""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class SocketRateLimiter:
+    """Per-sid and per-game token buckets for inbound socket events.
+
+    ``allow()`` is checked at the top of each handler and ``allow_game()`` once
+    the sender is known to be seated.  Rejected events are counted in
+    ``throttled`` (keyed by event name) and the handler tells the client.
+    """
+
+    def __init__(self, limits=None, clock=time.monotonic):
+        self.limits = merge_limits(limits)
+        self.clock = clock
+        self.buckets = {}
+        self.throttled = Counter()
+        self._throttled_sids = set()
+
+    def _bucket(self, key, rate, burst, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= PRUNE_THRESHOLD:
+                self._prune(now)
+            bucket = self.buckets[key] = TokenBucket(rate, burst, now)
+        return bucket
+
+    def room_bucket(self, room):
+        """Bucket capping outbound broadcasts to ``room``."""
+        return self._bucket(('room', room), *self.limits['room'], self.clock())
+
+    def _prune(self, now):
+        cutoff = now - IDLE_BUCKET_SECONDS
+        for key in [k for k, b in self.buckets.items() if b.updated < cutoff]:
+            del self.buckets[key]
+
+    def allow(self, event, sid):
+        """Charge the connection's own bucket; checked before anything else."""
+        limit = self.limits['sid'].get(event)
+        now = self.clock()
+        if limit and not self._bucket(('sid', sid, event), *limit, now).consume(now):
+            return self._reject(event, sid)
+        return True
+
+    def allow_game(self, event, sid, game_id):
+        """Charge the game's shared bucket.
+
+        Only call this once ``sid`` is known to hold a seat in ``game_id``, so
+        bystanders can't spend the players' budget.
+        """
+        limit = self.limits['game'].get(event)
+        now = self.clock()
+        if limit and not self._bucket(('game', game_id, event), *limit, now).consume(now):
+            return self._reject(event, sid, game_id)
+        return True
+
+    def _reject(self, event, sid, game_id=None):
+        self.throttled[event] += 1
+        # Warn once per offending connection rather than once per dropped event.
+        if sid not in self._throttled_sids:
+            self._throttled_sids.add(sid)
+            logger.warning(f"Throttling {event} from {sid} (game {game_id})")
+        return False
+
+    def forget_sid(self, sid):
+        self._throttled_sids.discard(sid)
+        for key in [k for k in self.buckets if k[0] == 'sid' and k[1] == sid]:
+            del self.buckets[key]
+
+
+class RoomBroadcaster:
+    """Caps outbound broadcasts per room, deferring and coalescing the overflow.
+
+    Once a room's budget is spent, broadcasts queue up and drain as tokens
+    free up, in order.  A queued event superseded by a newer one with the same
+    coalescing key (by default its name) is dropped, since only the latest
+    state matters.  Pass ``coalesce=False`` for events that must all arrive,
+    such as turn results.
+    """
+
+    def __init__(self, socketio, limiter):
+        self.socketio = socketio
+        self.limiter = limiter
+        self._pending = {}
+
+    def emit(self, event, payload, room, coalesce=True, skip_sid=None):
+        queue = self._pending.get(room)
+        if queue is None and self.limiter.room_bucket(room).consume(self.limiter.clock()):
+            self.socketio.emit(event, payload, to=room, skip_sid=skip_sid)
+            return
+
+        self.limiter.throttled['emit:' + event] += 1
+        key = event if coalesce is True else coalesce or None
+        if queue is None:
+            self._pending[room] = [(key, event, payload, skip_sid)]
+            self.socketio.start_background_task(self._flush, room)
+            return
+        if key is not None:
+            for i, queued in enumerate(queue):
+                if queued[0] == key:
+                    del queue[i]
+                    break
+        queue.append((key, event, payload, skip_sid))
+
+    def _flush(self, room):
+        queue = self._pending[room]
+        try:
+            while queue:
+                bucket = self.limiter.room_bucket(room)
+                self.socketio.sleep(bucket.wait_time())
+                if bucket.consume(self.limiter.clock()):
+                    _, event, payload, skip_sid = queue.pop(0)
+                    self.socketio.emit(event, payload, to=room, skip_sid=skip_sid)
+        except Exception:
+            logger.exception(f"Broadcast to room {room} failed, dropping {len(queue)} queued behind it")
+        finally:
+            # A queue left behind would make every later emit() wait on a
+            # flush that no longer runs.
+            del self._pending[room]
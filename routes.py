@@ -1,30 +1,35 @@
 import uuid
 import logging
 
-from flask import request, jsonify, render_template
+from flask import request, jsonify
 from engine.game import SimChessGame
 
 logger = logging.getLogger(__name__)
 
 
-def register_routes(app, games, socketio):
+def register_routes(app, games, broadcaster, assets, drain):
     @app.route('/')
     def index():
-        return render_template('index.html')
+        return assets.render_page('index.html')
 
     @app.route('/join/<game_id>')
     def join_game(game_id):
         # Render the same page; JS on the client will detect the path and auto-join
-        return render_template('index.html')
+        return assets.render_page('index.html')
 
     @app.route('/api/create_game', methods=['POST'])
     def create_game():
+        if drain.active:
+            return jsonify({"success": False, "message": "Server is restarting, try again shortly"}), 503
         game_id = str(uuid.uuid4())
         games[game_id] = SimChessGame(game_id)
         return jsonify({"game_id": game_id})
 
     @app.route('/api/resign_game', methods=['POST'])
     def resign_game():
+        if drain.active:
+            return jsonify({"success": False, "message": "Server is restarting, try again shortly"}), 503
+
         data = request.json
         game_id = data.get('game_id')
         player_color = data.get('player_color')
@@ -46,6 +51,6 @@ def register_routes(app, games, socketio):
 
         logger.info(f"Game {game_id} ended by resignation. Winner: {opponent}")
 
-        socketio.emit('game_state_update', {'game_state': game.get_state()}, room=game_id)
+        broadcaster.emit('game_state_update', {'game_state': game.get_state()}, game_id)
 
         return jsonify({"success": True, "message": "Resignation accepted"})
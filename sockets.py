@@ -6,37 +6,77 @@ from flask_socketio import emit, join_room
 logger = logging.getLogger(__name__)
 
 
-def register_sockets(socketio, games):
+def register_sockets(socketio, games, limiter, broadcaster, drain, tracer):
+    def redirect_if_draining():
+        # Games now live in the replacement process; send the client there.
+        if drain.active:
+            emit('server_handoff', {})
+            return True
+        return False
+
+    def throttled(event):
+        # Tell the client, so it isn't left waiting for a reply that never comes
+        emit('throttled', {'event': event})
+
+    def is_seated(game):
+        return request.sid in game.players.values()
+
+    @socketio.on('disconnect')
+    def on_disconnect():
+        limiter.forget_sid(request.sid)
+
     @socketio.on('join')
+    @tracer.handler('join')
     def on_join(data):
         game_id = data['game_id']
+        if not limiter.allow('join', request.sid):
+            throttled('join')
+            return
+        if redirect_if_draining():
+            return
         if game_id not in games:
             emit('error', {'message': 'Game not found'})
             return
 
         player_id = request.sid
-        color = games[game_id].assign_player(player_id)
+        game = games[game_id]
+        seat_token = data.get('seat_token')
+        color = game.assign_player(player_id, seat_token)
+        # A player reclaiming their seat (e.g. after a hand-off) isn't news to the room
+        resumed = color is not None and seat_token is not None
 
         if color:
             join_room(game_id)
             emit('joined', {
                 'color': color,
-                'game_state': games[game_id].get_state()
+                'seat_token': game.seat_tokens[color],
+                'game_state': game.get_state()
             })
-            emit('player_joined', {
+            if resumed:
+                return
+            broadcaster.emit('player_joined', {
                 'color': color,
-                'game_state': games[game_id].get_state()
-            }, room=game_id, include_self=False)
+                'game_state': game.get_state()
+            }, game_id, coalesce=False, skip_sid=player_id)
+        elif seat_token:
+            emit('error', {'message': 'Your seat in this game could not be restored'})
         else:
             emit('error', {'message': 'Game is full'})
 
     @socketio.on('submit_move')
+    @tracer.handler('submit_move')
     def on_submit_move(data):
         game_id = data['game_id']
         color = data['color']
         move = data['move']
         client_clocks = data.get('clock_seconds')
 
+        if not limiter.allow('submit_move', request.sid):
+            throttled('submit_move')
+            return
+        if redirect_if_draining():
+            return
+
         logger.debug(f"Received move: {color}={move} for game {game_id}")
 
         if game_id not in games:
@@ -44,6 +84,12 @@ def register_sockets(socketio, games):
             return
 
         game = games[game_id]
+        if game.players.get(color) != request.sid:
+            emit('error', {'message': 'You are not playing this colour'})
+            return
+        if not limiter.allow_game('submit_move', request.sid, game_id):
+            throttled('submit_move')
+            return
 
         if client_clocks:
             if client_clocks.get('white') is not None:
@@ -53,37 +99,58 @@ def register_sockets(socketio, games):
 
         result = game.submit_move(color, move)
 
-        emit('move_submitted', {
+        # Each side's submission stops that side's clock, so never merge the two
+        broadcaster.emit('move_submitted', {
             'color': color,
             'game_state': game.get_state()
-        }, room=game_id)
+        }, game_id, coalesce=('move_submitted', color))
 
         if result:
-            emit('moves_processed', {
+            broadcaster.emit('moves_processed', {
                 'result': result,
                 'game_state': game.get_state()
-            }, room=game_id)
+            }, game_id, coalesce=False)
 
     @socketio.on('start_clocks')
+    @tracer.handler('start_clocks')
     def on_start_clocks(data):
         game_id = data['game_id']
-        if game_id in games:
-            emit('clocks_started', {}, room=game_id)
+        if not limiter.allow('start_clocks', request.sid):
+            throttled('start_clocks')
+            return
+        if redirect_if_draining():
+            return
+        game = games.get(game_id)
+        if game is None or not is_seated(game):
+            return
+        if not limiter.allow_game('start_clocks', request.sid, game_id):
+            throttled('start_clocks')
+            return
+        broadcaster.emit('clocks_started', {}, game_id)
 
     @socketio.on('time_out')
+    @tracer.handler('time_out')
     def on_time_out(data):
         game_id = data['game_id']
         color = data['color']
 
-        if game_id not in games:
+        if not limiter.allow('time_out', request.sid):
+            throttled('time_out')
+            return
+        if redirect_if_draining():
+            return
+        game = games.get(game_id)
+        if game is None or not is_seated(game):
+            return
+        if not limiter.allow_game('time_out', request.sid, game_id):
+            throttled('time_out')
             return
 
-        game = games[game_id]
         winner = 'black' if color == 'white' else 'white'
         game.game_over = True
         game.winner = winner
         game.win_reason = 'timeout'
 
-        emit('game_state_update', {
+        broadcaster.emit('game_state_update', {
             'game_state': game.get_state()
-        }, room=game_id)
+        }, game_id)
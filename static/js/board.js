@@ -41,7 +41,9 @@ $(function () {
             position:     initialPosition,
             orientation:  SC.playerColor === 'white' ? 'white' : 'black',
             showNotation: true,
-            pieceTheme:   'https://chessboardjs.com/img/chesspieces/wikipedia/{piece}.png',
+            pieceTheme:   window.SimChessPieceImages
+                              ? function (piece) { return SimChessPieceImages[piece]; }
+                              : '/static/img/chesspieces/wikipedia/{piece}.png',
             draggable:    true,
             onDragStart:  onDragStart,
             onDrop:       onDrop,
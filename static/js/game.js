@@ -12,12 +12,14 @@ window.SimChess = {
 
     // Session state
     playerColor:     null,
+    seatToken:       null,
     gameId:          null,
     currentMove:     null,
     localChessGame:  null,
     allowMoves:      true,
     attemptNumber:   0,
     pendingPosition: null,
+    gameOver:        false,
 
     // Move history
     moveHistory:      [],
@@ -52,6 +54,7 @@ $(function () {
     // -- updateGameState (used by socket.js via SC.*) -------------------------
     SC.updateGameState = function (gameState, preservePosition) {
         preservePosition = preservePosition || false;
+        if (gameState.game_over) SC.gameOver = true;
         $('#turn-number').text(gameState.turn_number);
 
         SC.attemptNumber = gameState.illegal_attempt || 0;
@@ -138,7 +141,7 @@ $(function () {
     }
 
     // -- Lobby handlers -------------------------------------------------------
-    $('#create-game').click(function () {
+    function createGame(retriesLeft) {
         $.post('/api/create_game', function (data) {
             SC.gameId = data.game_id;
             SC.initializeSocket();
@@ -146,8 +149,18 @@ $(function () {
             $('#invite-link-text').text(inviteUrl);
             $('#game-id-display').removeClass('hidden');
             $('#create-game').addClass('hidden');
+        }).fail(function (xhr) {
+            // 503 means the server is handing over to a new process; retry shortly
+            if (xhr.status === 503 && retriesLeft > 0) {
+                setTimeout(function () { createGame(retriesLeft - 1); }, 500);
+                return;
+            }
+            var message = (xhr.responseJSON && xhr.responseJSON.message) || 'Could not create a game';
+            alert('Error: ' + message);
         });
-    });
+    }
+
+    $('#create-game').click(function () { createGame(5); });
 
     $('#join-game').click(function () {
         var raw   = $('#game-id-input').val().trim();
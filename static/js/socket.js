@@ -4,16 +4,37 @@ $(function () {
     const SC = SimChess;
 
     SC.initializeSocket = function () {
-        SC.socket = io();
+        // WebSocket only: during a deploy two processes share the port, and a
+        // long-polling session split across them would be rejected.
+        SC.socket = io({ transports: ['websocket'] });
 
         SC.socket.on('connect', function () {
-            SC.socket.emit('join', { game_id: SC.gameId });
+            // Finished games don't survive a deploy; rejoining would only
+            // report the game as missing over the result screen.
+            if (SC.gameOver) {
+                SC.socket.disconnect();
+                return;
+            }
+            // seatToken is set on reconnect, so the server gives us our seat back
+            SC.socket.emit('join', { game_id: SC.gameId, seat_token: SC.seatToken });
+        });
+
+        // The server is being replaced; reconnect to the new process (jittered
+        // so thousands of clients don't arrive in the same millisecond).
+        SC.socket.on('server_handoff', function () {
+            SC.socket.disconnect();
+            if (SC.gameOver) return;
+            setTimeout(function () { SC.socket.connect(); }, 250 + Math.random() * 500);
         });
 
         SC.socket.on('joined', function (data) {
             SC.playerColor = data.color;
+            SC.seatToken   = data.seat_token;
             SC.updateGameState(data.game_state);
 
+            // Resumed after a reconnect: the board and history are already up
+            if (SC.board) return;
+
             $('#header-game-id-text').text(SC.gameId);
             $('#header-game-id').removeClass('hidden').css('display', 'flex');
 
@@ -70,6 +91,7 @@ $(function () {
 
             // Rule-based game over (illegality draw / timeout penalty exhaustion)
             if (result.game_over || result.draw || result.winner) {
+                SC.gameOver = true;
                 SC.stopAllClocks();
                 let title, sub, isWin = false;
                 if (result.draw) {
@@ -216,6 +238,22 @@ $(function () {
             }
         });
 
+        // The server dropped one of our events for arriving too fast. A dropped
+        // move would otherwise leave us waiting forever, so hand it back.
+        SC.socket.on('throttled', function (data) {
+            if (data.event !== 'submit_move') return;
+            SC.allowMoves      = true;
+            SC.pendingPosition = null;
+            $('#waiting-message')
+                .html('<p class="text-sm text-cyan-100">Too many moves too quickly &mdash; please submit again.</p>')
+                .removeClass('hidden');
+            if (SC.currentMove) {
+                $('#submit-move').removeClass('hidden');
+                $('#reset-move').removeClass('hidden');
+            }
+            SC.startPlayerClock(SC.playerColor);
+        });
+
         SC.socket.on('error', function (data) {
             alert('Error: ' + data.message);
         });